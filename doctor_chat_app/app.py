@@ -6,10 +6,10 @@ appointments, and interact with an LLM assistant.
 # Standard library imports
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Third-party imports
-import pandas as pd
 import streamlit as st
 from dotenv import load_dotenv
 
@@ -22,6 +22,30 @@ from models.schema import Patient, Consultation, Appointment
 # Load environment variables
 load_dotenv()
 
+# Number of consultations shown per page in the history tab
+CONSULTATION_PAGE_SIZE = 10
+
+# Number of chat messages rendered per run; older turns stay in the
+# session but are not re-rendered on every run
+CHAT_HISTORY_WINDOW = 20
+
+# Category badge markup: the CSS is injected once per page, so each
+# rerun ships only the short class-name strings below
+_BADGE_CSS = (
+    "<style>"
+    ".chronic-badge{background-color:#FFDDDD;padding:3px 8px;"
+    "border-radius:3px;}"
+    ".acute-badge{background-color:#DDFFDD;padding:3px 8px;"
+    "border-radius:3px;}"
+    "</style>"
+)
+_CHRONIC_BADGE_HTML = (
+    "**Patient Category:** <span class='chronic-badge'>⚠️ Chronic</span>"
+)
+_ACUTE_BADGE_HTML = (
+    "**Patient Category:** <span class='acute-badge'>✓ Acute</span>"
+)
+
 # Page configuration
 st.set_page_config(
     page_title="ChronicStable - Doctor Chat",
@@ -29,6 +53,9 @@ st.set_page_config(
     layout="wide",
 )
 
+# Inject shared styles once per page
+st.markdown(_BADGE_CSS, unsafe_allow_html=True)
+
 
 @st.cache_resource
 def init_services():
@@ -51,124 +78,189 @@ def init_services():
     return db_service, ollama_service
 
 
+@st.cache_resource
+def warmup_pool():
+    """Single background worker used to warm Ollama during DB fetches."""
+    return ThreadPoolExecutor(max_workers=1)
+
+
 db_service, ollama_service = init_services()
 
+
+# Cached read paths: every rerun re-executes this script, so memoize
+# the DB lookups and invalidate explicitly after writes.
+@st.cache_data(ttl=300)
+def get_all_doctors():
+    return db_service.get_all_doctors()
+
+
+@st.cache_data(ttl=300)
+def get_doctor_name(doctor_id):
+    return db_service.get_doctor_name(doctor_id)
+
+
+@st.cache_data(ttl=300)
+def list_patients(doctor_id, category):
+    return db_service.list_patients(doctor_id, category)
+
+
+@st.cache_data(ttl=300)
+def get_patient(patient_id):
+    return db_service.get_patient(patient_id)
+
+
+@st.cache_data(ttl=300)
+def get_patient_consultations(patient_id, limit=None, offset=None):
+    return db_service.get_patient_consultations(patient_id, limit, offset)
+
+
+@st.cache_data(ttl=300)
+def get_patient_appointments_df(patient_id):
+    return db_service.get_patient_appointments_df(patient_id)
+
+
+@st.cache_data
+def get_patient_context(patient_id, version):
+    """Build (or reuse) the LLM context for a patient.
+
+    The version argument is bumped by write handlers, so repeat chat
+    turns about an unchanged patient hit the cache instead of
+    re-querying and re-formatting the context.
+    """
+    return build_patient_context(patient_id=patient_id, db_service=db_service)
+
+
+# Per-patient invalidation tokens for the cached LLM context
+st.session_state.setdefault("patient_version", {})
+
+
 # UI Components
 st.sidebar.title("ChronicStable")
 st.sidebar.subheader("Doctor's Assistant")
 
-# Doctor selection (for demo purposes)
-doctor_id = st.sidebar.selectbox(
-    "Select Doctor",
-    options=db_service.get_all_doctors(),
-    format_func=lambda x: db_service.get_doctor_name(x)
-)
+# Doctor/patient selection runs inside a form so changing a selector
+# queues the value instead of firing a rerun per widget change; one
+# rerun happens on Apply
+with st.sidebar.form("selection", border=False):
+    # Doctor selection (for demo purposes)
+    doctor_id = st.selectbox(
+        "Select Doctor",
+        options=get_all_doctors(),
+        format_func=get_doctor_name
+    )
 
-# Patient category filter
-patient_category_filter = st.sidebar.radio(
-    "Filter Patients By Category",
-    options=["all", "chronic", "acute"],
-    horizontal=True,
-    index=0,
-    format_func=lambda x: x.capitalize()
-)
+    # Patient category filter
+    patient_category_filter = st.radio(
+        "Filter Patients By Category",
+        options=["all", "chronic", "acute"],
+        horizontal=True,
+        index=0,
+        format_func=lambda x: x.capitalize()
+    )
 
-# Patient selection with filtering
-if patient_category_filter == "all":
-    patient_list = db_service.get_patients_for_doctor(doctor_id)
-else:
-    patient_list = db_service.get_patients_by_category(
-        doctor_id, patient_category_filter
+    # Patient selection with filtering; a single query returns
+    # (id, name, category) so the selectbox needs no per-row lookups
+    patient_records = list_patients(
+        doctor_id,
+        None if patient_category_filter == "all" else patient_category_filter
     )
+    patient_labels = {
+        pid: f"{name} ({category.capitalize()})"
+        for pid, name, category in patient_records
+    }
 
-# Show count of patients by category
-if patient_list:
-    st.sidebar.caption(f"Showing {len(patient_list)} patient(s)")
+    # Show count of patients by category
+    if patient_records:
+        st.caption(f"Showing {len(patient_records)} patient(s)")
 
-patient_id = st.sidebar.selectbox(
-    "Select Patient",
-    options=patient_list,
-    format_func=lambda x: (
-        f"{db_service.get_patient_name(x)} "
-        f"({db_service.get_patient_category(x).capitalize()})"
+    patient_id = st.selectbox(
+        "Select Patient",
+        options=list(patient_labels),
+        format_func=patient_labels.get
     )
-)
+
+    st.form_submit_button("Apply")
 
 # Tab navigation
 tab1, tab2, tab3 = st.tabs(["Chat", "Patient History", "Schedule"])
 
 # Tab 1: Chat Interface
-with tab1:
+# Each tab body is a fragment, so interactions inside a tab rerun only
+# that tab instead of the whole script (sidebar, other tabs included).
+@st.fragment
+def render_chat_tab(patient_id):
+    """Render the chat interface for the selected patient."""
     st.header("Doctor AI Assistant")
-    
+
     # Display selected patient info
     if patient_id:
-        patient = db_service.get_patient(patient_id)
+        patient = get_patient(patient_id)
         st.subheader(f"Patient: {patient.name}")
-        
+
         # Initialize chat history
         if "messages" not in st.session_state:
             st.session_state.messages = []
-            
+
         # Create containers for messages and status
         message_container = st.container()
         status_container = st.container()
-        
-        # Display chat history in the message container
+
+        # Display the most recent chat history in the message container;
+        # long sessions would otherwise re-render every turn on each run
         with message_container:
-            for message in st.session_state.messages:
+            if len(st.session_state.messages) > CHAT_HISTORY_WINDOW:
+                st.caption(
+                    f"Showing the last {CHAT_HISTORY_WINDOW} messages"
+                )
+            for message in st.session_state.messages[-CHAT_HISTORY_WINDOW:]:
                 with st.chat_message(message["role"]):
                     st.markdown(message["content"])
-        
+
         # Display the input at the bottom
         prompt = st.chat_input("Ask about your patient...")
-        
-        # Track if we're currently processing a response in the session state
-        if "processing" not in st.session_state:
-            st.session_state.processing = False
-        
-        # Process the user input
-        if prompt and not st.session_state.processing:
-            # Add user message to chat history
+
+        # Process the user input and stream the reply in a single run
+        if prompt:
+            # Add user message to chat history and draw it immediately
             st.session_state.messages.append({"role": "user", "content": prompt})
-            # Set the processing flag to prevent duplicate processing
-            st.session_state.processing = True
-            st.rerun()
-        
-        # Handle response generation
-        if (st.session_state.processing and 
-                len(st.session_state.messages) > 0 and 
-                st.session_state.messages[-1]["role"] == "user"):
-            # Get the last message from the user
-            last_prompt = st.session_state.messages[-1]["content"]
-            
+            with status_container:
+                with st.chat_message("user"):
+                    st.markdown(prompt)
+
+            # Warm the model in the background while the patient
+            # context is fetched, overlapping the two serial stages
+            warm = warmup_pool().submit(ollama_service.warm_up)
+
             # Build context for the LLM with patient information
-            context = build_patient_context(
-                patient_id=patient_id,
-                db_service=db_service
+            context = get_patient_context(
+                patient_id,
+                st.session_state.patient_version.get(patient_id, 0)
             )
-            
-            # Show thinking spinner while getting response
+            warm.result()
+
+            # Stream the response token by token as it is generated
             with status_container:
-                with st.spinner("Thinking..."):
-                    response = ollama_service.get_response(last_prompt, context)
-            
+                with st.chat_message("assistant"):
+                    response = st.write_stream(
+                        ollama_service.stream_response(prompt, context)
+                    )
+
             # Add assistant message to chat history
             st.session_state.messages.append(
                 {"role": "assistant", "content": response}
             )
-            # Reset the processing flag
-            st.session_state.processing = False
-            st.rerun()
     else:
         st.info("Please select a patient to start chatting")
 
+
 # Tab 2: Patient History
-with tab2:
+@st.fragment
+def render_history_tab(patient_id):
+    """Render medical history and category management for the patient."""
     st.header("Patient Medical History")
-    
+
     if patient_id:
-        patient = db_service.get_patient(patient_id)
+        patient = get_patient(patient_id)
         st.subheader(f"Patient: {patient.name}")
         
         col1, col2 = st.columns(2)
@@ -182,17 +274,9 @@ with tab2:
         with col2:
             # Display current category with appropriate highlighting
             if patient.category == "chronic":
-                st.markdown(
-                    "**Patient Category:** <span style='background-color:#FFDDDD; "
-                    "padding:3px 8px; border-radius:3px;'>⚠️ Chronic</span>",
-                    unsafe_allow_html=True
-                )
+                st.markdown(_CHRONIC_BADGE_HTML, unsafe_allow_html=True)
             else:
-                st.markdown(
-                    "**Patient Category:** <span style='background-color:#DDFFDD; "
-                    "padding:3px 8px; border-radius:3px;'>✓ Acute</span>",
-                    unsafe_allow_html=True
-                )
+                st.markdown(_ACUTE_BADGE_HTML, unsafe_allow_html=True)
             
             # Allow doctor to change patient category
             new_category = st.radio(
@@ -205,15 +289,25 @@ with tab2:
             if st.button("Update Category"):
                 # Update patient category in database
                 db_service.update_patient_category(patient_id, new_category)
+                # Invalidate cached reads so the new category is visible
+                st.cache_data.clear()
+                st.session_state.patient_version[patient_id] = time.time()
                 st.success(f"Patient category updated to {new_category}")
-                # Add a small delay before reloading the page
-                time.sleep(0.5)
-                st.rerun()
+                # The commit is synchronous, so only this tab needs to
+                # redraw to pick up the new category
+                st.rerun(scope="fragment")
         
-        # Previous consultations
+        # Previous consultations, paginated so a long chronic history
+        # doesn't cost a widget per record on every rerun
         st.subheader("Previous Consultations")
-        consultations = db_service.get_patient_consultations(patient_id)
-        
+
+        if "consult_limit" not in st.session_state:
+            st.session_state.consult_limit = CONSULTATION_PAGE_SIZE
+
+        consultations = get_patient_consultations(
+            patient_id, limit=st.session_state.consult_limit
+        )
+
         if consultations:
             for consultation in consultations:
                 with st.expander(
@@ -223,32 +317,44 @@ with tab2:
                     st.markdown(
                         f"**Treatment Plan:** {consultation.treatment_plan}"
                     )
+
+            # A full page means there may be older records to load
+            if len(consultations) == st.session_state.consult_limit:
+                if st.button("Show older consultations"):
+                    st.session_state.consult_limit += CONSULTATION_PAGE_SIZE
+                    st.rerun()
         else:
             st.info("No previous consultations found")
     else:
         st.info("Please select a patient to view history")
 
+
 # Tab 3: Scheduling
-with tab3:
+@st.fragment
+def render_schedule_tab(patient_id, doctor_id):
+    """Render current appointments and the scheduling form."""
     st.header("Appointment Scheduling")
-    
+
     if patient_id:
-        patient = db_service.get_patient(patient_id)
+        patient = get_patient(patient_id)
         st.subheader(f"Patient: {patient.name}")
         
-        # Current appointments
+        # Current appointments, read straight from SQL into a DataFrame
         st.subheader("Current Appointments")
-        appointments = db_service.get_patient_appointments(patient_id)
-        
-        if appointments:
-            appointments_df = pd.DataFrame([
-                {
-                    "Date": apt.date_time.strftime("%Y-%m-%d %H:%M"),
-                    "Purpose": apt.purpose,
-                    "Status": apt.status
-                } for apt in appointments
-            ])
-            
+        appointments_df = get_patient_appointments_df(patient_id)
+
+        if not appointments_df.empty:
+            appointments_df = appointments_df.rename(columns={
+                "date_time": "Date",
+                "purpose": "Purpose",
+                "status": "Status",
+            })
+            # Format all dates in one vectorized pass instead of one
+            # Python-level strftime call per row
+            appointments_df["Date"] = (
+                appointments_df["Date"].dt.strftime("%Y-%m-%d %H:%M")
+            )
+
             st.dataframe(appointments_df)
         else:
             st.info("No appointments scheduled")
@@ -274,7 +380,10 @@ with tab3:
                     purpose=apt_purpose,
                     status="scheduled"
                 )
-                
+
+                # Invalidate cached reads so the new appointment is visible
+                st.cache_data.clear()
+                st.session_state.patient_version[patient_id] = time.time()
                 st.success(
                     f"Appointment scheduled for "
                     f"{apt_datetime.strftime('%Y-%m-%d %H:%M')}"
@@ -283,6 +392,16 @@ with tab3:
         st.info("Please select a patient to schedule appointments")
 
 
+with tab1:
+    render_chat_tab(patient_id)
+
+with tab2:
+    render_history_tab(patient_id)
+
+with tab3:
+    render_schedule_tab(patient_id, doctor_id)
+
+
 # Footer
 st.sidebar.markdown("---")
 st.sidebar.info(
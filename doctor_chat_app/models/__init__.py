@@ -0,0 +1,8 @@
+"""Data models package for ChronicStable Doctor Chat application.
+
+Re-exports the canonical model classes from models.schema so there is
+a single import location for them.
+"""
+from .schema import Appointment, Consultation, Doctor, Patient
+
+__all__ = ["Patient", "Doctor", "Consultation", "Appointment"]
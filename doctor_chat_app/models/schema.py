@@ -6,8 +6,10 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Optional
 
+__all__ = ["Patient", "Doctor", "Consultation", "Appointment"]
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class Patient:
     """Patient data model."""
     id: int
@@ -18,7 +20,7 @@ class Patient:
     category: str  # 'chronic' or 'acute'
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Doctor:
     """Doctor data model with professional information."""
     id: int
@@ -27,7 +29,7 @@ class Doctor:
     credentials: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Consultation:
     """Patient consultation data model for medical visits."""
     id: int
@@ -39,7 +41,7 @@ class Consultation:
     treatment_plan: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Appointment:
     """Appointment data model for scheduling patient visits."""
     id: int
@@ -3,13 +3,19 @@
 Provides models and services for accessing patient, doctor, appointment,
 and consultation data from the database.
 """
+import io
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from sqlalchemy import (Column, DateTime, ForeignKey, Integer, String, Text,
-                        create_engine)
+import pandas as pd
+from sqlalchemy import (Column, DateTime, ForeignKey, Index, Integer, String,
+                        Text, bindparam, create_engine, func, lambda_stmt,
+                        select, text)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import Session, relationship, sessionmaker
+from sqlalchemy.orm import (Session, raiseload, relationship,
+                            scoped_session, sessionmaker)
+from sqlalchemy.pool import StaticPool
 
 # Database models
 Base = declarative_base()
@@ -38,10 +44,16 @@ class Patient(Base):
     contact_information = Column(String(100))
     medical_record_number = Column(String(20), unique=True)
     category = Column(String(10), default="acute")  # 'chronic' or 'acute'
-    
+
     # Relationships
-    consultations = relationship("Consultation", back_populates="patient")
-    appointments = relationship("Appointment", back_populates="patient")
+    consultations = relationship(
+        "Consultation", back_populates="patient",
+        order_by="Consultation.date.desc()"
+    )
+    appointments = relationship(
+        "Appointment", back_populates="patient",
+        order_by="Appointment.date_time"
+    )
 
 
 class Consultation(Base):
@@ -55,7 +67,16 @@ class Consultation(Base):
     notes = Column(Text)
     diagnosis = Column(String(100))
     treatment_plan = Column(Text)
-    
+
+    # Both foreign keys are indexed: the composite's leading patient_id
+    # column doubles as the patient_id FK index (it also covers the
+    # recent-consultations date ordering), and ix_consult_doctor backs
+    # the per-doctor patient-list union
+    __table_args__ = (
+        Index("ix_consult_patient_date", "patient_id", "date"),
+        Index("ix_consult_doctor", "doctor_id"),
+    )
+
     # Relationships
     patient = relationship("Patient", back_populates="consultations")
     doctor = relationship("Doctor", back_populates="consultations")
@@ -71,11 +92,99 @@ class Appointment(Base):
     date_time = Column(DateTime)
     status = Column(String(20))  # scheduled, completed, canceled
     purpose = Column(String(200))
-    
+
+    # Both foreign keys are indexed: the composite's leading patient_id
+    # column doubles as the patient_id FK index (it also covers the
+    # upcoming-appointments time/status predicates), and ix_appt_doctor
+    # backs the per-doctor patient-list union
+    __table_args__ = (
+        Index("ix_appt_patient_dt_status", "patient_id", "date_time",
+              "status"),
+        Index("ix_appt_doctor", "doctor_id"),
+    )
+
     # Relationships
     patient = relationship("Patient", back_populates="appointments")
     doctor = relationship("Doctor", back_populates="appointments")
 
+
+# Lambda-cached statements for the hottest lookups: the select construct
+# is built and analyzed once per process and only the closure values are
+# re-extracted as bound parameters on subsequent calls.
+def _doctor_name_stmt(doctor_id: int):
+    return lambda_stmt(
+        lambda: select(Doctor.name).where(Doctor.id == doctor_id)
+    )
+
+
+def _patient_by_id_stmt(patient_id: int):
+    return lambda_stmt(
+        lambda: select(Patient).where(Patient.id == patient_id)
+    )
+
+
+def _patient_consultations_stmt(
+    patient_id: int, limit: Optional[int], offset: Optional[int]
+):
+    stmt = lambda_stmt(
+        lambda: select(Consultation).where(
+            Consultation.patient_id == patient_id
+        ).order_by(Consultation.date.desc())
+    )
+    if offset is not None:
+        stmt += lambda s: s.offset(offset)
+    if limit is not None:
+        stmt += lambda s: s.limit(limit)
+    return stmt
+
+
+# Prepared statements for the remaining getters, built once at import
+# time and executed with bound parameters, so per-call work is reduced
+# to parameter binding. Getters whose shape varies per call use the
+# lambda-cached builders above instead.
+_ALL_DOCTOR_IDS_STMT = select(Doctor.id)
+
+_PATIENT_NAME_STMT = select(Patient.name).where(
+    Patient.id == bindparam("pid")
+)
+
+_PATIENT_CATEGORY_STMT = select(Patient.category).where(
+    Patient.id == bindparam("pid")
+)
+
+_PATIENT_APPOINTMENTS_STMT = select(Appointment).where(
+    Appointment.patient_id == bindparam("pid")
+).order_by(Appointment.date_time.asc())
+
+_UPCOMING_APPOINTMENTS_STMT = select(
+    Appointment.date_time,
+    Appointment.purpose,
+    Doctor.name.label("doctor_name"),
+).outerjoin(
+    Doctor, Appointment.doctor_id == Doctor.id
+).where(
+    Appointment.patient_id == bindparam("pid"),
+    Appointment.date_time > bindparam("now"),
+    Appointment.status == "scheduled",
+).order_by(Appointment.date_time.asc())
+
+_RECENT_CONSULTATIONS_STMT = select(
+    Consultation.date,
+    Consultation.diagnosis,
+    Consultation.notes,
+    Consultation.treatment_plan,
+    Doctor.name.label("doctor_name"),
+).outerjoin(
+    Doctor, Consultation.doctor_id == Doctor.id
+).where(
+    Consultation.patient_id == bindparam("pid")
+).order_by(Consultation.date.desc())
+
+_RECENT_CONSULTATIONS_LIMITED_STMT = _RECENT_CONSULTATIONS_STMT.limit(
+    bindparam("lim")
+)
+
+
 class DatabaseService:
     """Service for interacting with the database.
     
@@ -89,402 +198,703 @@ class DatabaseService:
         Args:
             database_url: URL for the database connection
         """
-        self.engine = create_engine(database_url)
-        self.Session = sessionmaker(bind=self.engine)
-        
+        # init_services() is cached with @st.cache_resource, so exactly
+        # one engine (and therefore one pool) exists per server process.
+        if database_url.startswith("sqlite"):
+            # A single shared connection is safe inside Streamlit's
+            # single-process server and avoids per-query file opens
+            self.engine = create_engine(
+                database_url,
+                connect_args={"check_same_thread": False},
+                poolclass=StaticPool,
+                query_cache_size=1200,
+            )
+        else:
+            # Pooled keep-alive connections: every rerun issues a
+            # handful of queries, so avoid a TCP handshake per query
+            self.engine = create_engine(
+                database_url,
+                pool_size=20,
+                max_overflow=40,
+                pool_timeout=30,
+                pool_pre_ping=True,
+                pool_recycle=1800,
+                query_cache_size=1200,
+            )
+
+        # Reruns issue the same handful of SELECTs with different bound
+        # parameters; an oversized engine-level statement cache keeps
+        # every hot query compiled for the life of the process
+        assert self.engine.dialect.supports_statement_cache
+        self.Session = scoped_session(
+            sessionmaker(bind=self.engine, expire_on_commit=False)
+        )
+
+        # Doctor names are never modified by the app, so resolved names
+        # are memoized for the life of the service singleton
+        self._doctor_name_cache: Dict[int, str] = {}
+
         # Create tables if they don't exist
         Base.metadata.create_all(self.engine)
-        
+
+        # create_all skips index creation for tables that already
+        # exist (e.g. the shipped sample database), so build any
+        # missing declared indexes explicitly
+        for table in Base.metadata.tables.values():
+            for index in table.indexes:
+                index.create(self.engine, checkfirst=True)
+
         # Initialize with sample data if empty
         self._initialize_sample_data()
+
+    @contextmanager
+    def _session_scope(
+        self, session: Optional[Session] = None
+    ) -> Iterator[Session]:
+        """Yield a session, opening and closing one only when needed.
+
+        Callers that already hold a session pass it through so a batch
+        of lookups shares one connection checkout instead of paying a
+        session open/close per call.
+
+        Args:
+            session: Optional existing session to reuse
+
+        Yields:
+            The session to run queries against
+        """
+        if session is not None:
+            yield session
+            return
+
+        owned = self.Session()
+        try:
+            yield owned
+        finally:
+            owned.close()
     
     def _initialize_sample_data(self):
         """Add sample data if the database is empty"""
         session = self.Session()
-        
+
         # Check if we already have data
         if session.query(Doctor).count() == 0:
-            # Create sample doctors
-            doctor1 = Doctor(name="Dr. Jane Smith", specialization="Cardiology", credentials="MD, FACC")
-            doctor2 = Doctor(name="Dr. Robert Johnson", specialization="Family Medicine", credentials="MD")
-            doctor3 = Doctor(name="Dr. Maria Garcia", specialization="Endocrinology", credentials="MD, PhD")
-            doctor4 = Doctor(name="Dr. David Chen", specialization="Neurology", credentials="MD, FAAN")
-            session.add_all([doctor1, doctor2, doctor3, doctor4])
-            session.commit()
-            
-            # Create sample patients with more detailed information
-            patient1 = Patient(
-                name="John Doe", 
-                date_of_birth="1980-05-15", 
-                contact_information="john.doe@email.com, (555) 123-4567", 
-                medical_record_number="MRN12345",
-                category="chronic"  # Cardiac patient with ongoing condition
-            )
-            patient2 = Patient(
-                name="Sarah Williams", 
-                date_of_birth="1992-09-23", 
-                contact_information="sarah.w@email.com, (555) 987-6543", 
-                medical_record_number="MRN67890",
-                category="acute"  # Generally healthy, comes for acute episodes
-            )
-            patient3 = Patient(
-                name="Michael Rodriguez", 
-                date_of_birth="1975-12-10", 
-                contact_information="m.rodriguez@email.com, (555) 555-5555", 
-                medical_record_number="MRN24680",
-                category="chronic"  # Diabetes patient requiring ongoing management
-            )
-            patient4 = Patient(
-                name="Emily Johnson", 
-                date_of_birth="1988-03-27", 
-                contact_information="emily.j@email.com, (555) 222-3333", 
-                medical_record_number="MRN13579",
-                category="chronic"  # Migraine patient requiring ongoing care
-            )
-            session.add_all([patient1, patient2, patient3, patient4])
-            session.commit()
-            
-            # Create comprehensive consultation history
-            # Patient 1 - John Doe - Cardiac patient
-            consultations1 = [
-                Consultation(
-                    patient_id=patient1.id,
-                    doctor_id=doctor1.id,
-                    date=datetime(2024, 11, 10),
-                    notes="Initial visit. Patient reports occasional chest pain during physical exertion. Family history of coronary artery disease. Father had MI at 58. Blood pressure 145/90. BMI 29.4.",
-                    diagnosis="Suspected coronary artery disease",
-                    treatment_plan="Ordered ECG and stress test. Prescribed atorvastatin 20mg daily. Recommended lifestyle changes including Mediterranean diet and moderate exercise."
-                ),
-                Consultation(
-                    patient_id=patient1.id,
-                    doctor_id=doctor1.id,
-                    date=datetime(2025, 1, 15),
-                    notes="Follow-up visit. Stress test reveals moderate ischemia. Patient reports improved symptoms with medication but still experiences occasional angina with exertion. Blood pressure improved to 138/85.",
-                    diagnosis="Stable angina",
-                    treatment_plan="Continued current medication. Added metoprolol 25mg twice daily. Scheduled coronary angiogram for further evaluation."
-                ),
-                Consultation(
-                    patient_id=patient1.id,
-                    doctor_id=doctor1.id,
-                    date=datetime(2025, 3, 5),
-                    notes="Post-angiogram follow-up. Angiogram showed 70% stenosis in LAD. Stent placed successfully. Patient reports no chest pain since procedure. Blood pressure 132/80.",
-                    diagnosis="Coronary artery disease, status post stent placement",
-                    treatment_plan="Continue atorvastatin and metoprolol. Added clopidogrel 75mg daily for 12 months. Cardiac rehabilitation recommended 3x weekly."
-                ),
-                Consultation(
-                    patient_id=patient1.id,
-                    doctor_id=doctor1.id,
-                    date=datetime(2025, 5, 20),
-                    notes="Patient presented with chest pain and shortness of breath. States he missed 3 doses of medication last week. ECG shows no acute changes. Blood pressure elevated at 152/92.",
-                    diagnosis="Angina pectoris",
-                    treatment_plan="Reinforced medication adherence. Prescribed nitroglycerin sublingual for acute episodes. Follow-up in 2 weeks."
-                )
-            ]
-            
-            # Patient 2 - Sarah Williams - Generally healthy
-            consultations2 = [
-                Consultation(
-                    patient_id=patient2.id,
-                    doctor_id=doctor2.id,
-                    date=datetime(2024, 8, 12),
-                    notes="Annual physical examination. Patient reports good overall health with occasional headaches after long work hours. No significant findings on physical exam. BMI 23.1, BP 118/78.",
-                    diagnosis="Healthy check-up, tension headaches",
-                    treatment_plan="Recommended regular breaks when working, proper hydration. Follow up in 12 months or as needed."
-                ),
-                Consultation(
-                    patient_id=patient2.id,
-                    doctor_id=doctor2.id,
-                    date=datetime(2025, 2, 3),
-                    notes="Patient presented with fever, cough, and congestion for 5 days. Temp 100.4°F. Lungs clear. Rapid COVID and flu tests negative.",
-                    diagnosis="Upper respiratory tract infection, likely viral",
-                    treatment_plan="Symptomatic treatment with acetaminophen, fluids, and rest. Return if symptoms worsen or persist beyond 10 days."
-                )
+            # Bulk-insert each table as one executemany-style statement
+            # with a single commit at the end; explicit IDs keep the
+            # cross-references stable without follow-up queries
+            doctor_rows = [
+                {"id": 1, "name": "Dr. Jane Smith",
+                 "specialization": "Cardiology", "credentials": "MD, FACC"},
+                {"id": 2, "name": "Dr. Robert Johnson",
+                 "specialization": "Family Medicine", "credentials": "MD"},
+                {"id": 3, "name": "Dr. Maria Garcia",
+                 "specialization": "Endocrinology", "credentials": "MD, PhD"},
+                {"id": 4, "name": "Dr. David Chen",
+                 "specialization": "Neurology", "credentials": "MD, FAAN"},
             ]
-            
-            # Patient 3 - Michael Rodriguez - Diabetes patient
-            consultations3 = [
-                Consultation(
-                    patient_id=patient3.id,
-                    doctor_id=doctor3.id,
-                    date=datetime(2024, 7, 22),
-                    notes="Initial visit for diabetes management. Patient reports polyuria, polydipsia, and unintentional weight loss of 15 lbs over 3 months. Random blood glucose 278 mg/dL. HbA1c 9.2%. Family history of T2DM.",
-                    diagnosis="Type 2 Diabetes Mellitus, newly diagnosed",
-                    treatment_plan="Started on metformin 500mg BID with meals. Diabetes education provided. Referral to nutritionist. Recommended daily blood glucose monitoring."
-                ),
-                Consultation(
-                    patient_id=patient3.id,
-                    doctor_id=doctor3.id,
-                    date=datetime(2024, 10, 18),
-                    notes="Follow-up visit. Patient reports improved symptoms. Has lost 5 more pounds intentionally through diet changes. Blood glucose readings averaging 160-180 mg/dL. HbA1c improved to 8.1%.",
-                    diagnosis="Type 2 Diabetes Mellitus, improving",
-                    treatment_plan="Increased metformin to 1000mg BID. Continued lifestyle modifications. Lab work ordered for kidney function and lipid panel."
-                ),
-                Consultation(
-                    patient_id=patient3.id,
-                    doctor_id=doctor3.id,
-                    date=datetime(2025, 1, 25),
-                    notes="Quarterly follow-up. Patient doing well with medication and diet compliance. Blood glucose readings now averaging 120-140 mg/dL. HbA1c 7.2%. Mild neuropathic symptoms noted in feet.",
-                    diagnosis="Type 2 Diabetes Mellitus with early peripheral neuropathy",
-                    treatment_plan="Continued current medication. Added alpha-lipoic acid supplement. Referred to podiatry for comprehensive foot evaluation."
-                ),
-                Consultation(
-                    patient_id=patient3.id,
-                    doctor_id=doctor1.id,
-                    date=datetime(2025, 4, 30),
-                    notes="Cardiology consultation for diabetes and newly detected hypertension. ECG normal. BP 148/88. Patient reports occasional palpitations.",
-                    diagnosis="Essential hypertension, Type 2 Diabetes Mellitus",
-                    treatment_plan="Started on lisinopril 10mg daily. Recommended DASH diet in addition to diabetic diet. 24-hour Holter monitor ordered for palpitations."
-                )
+
+            patient_rows = [
+                {
+                    "id": 1,
+                    "name": "John Doe",
+                    "date_of_birth": "1980-05-15",
+                    "contact_information": "john.doe@email.com, (555) 123-4567",
+                    "medical_record_number": "MRN12345",
+                    "category": "chronic"  # Cardiac patient with ongoing condition
+                },
+                {
+                    "id": 2,
+                    "name": "Sarah Williams",
+                    "date_of_birth": "1992-09-23",
+                    "contact_information": "sarah.w@email.com, (555) 987-6543",
+                    "medical_record_number": "MRN67890",
+                    "category": "acute"  # Generally healthy, comes for acute episodes
+                },
+                {
+                    "id": 3,
+                    "name": "Michael Rodriguez",
+                    "date_of_birth": "1975-12-10",
+                    "contact_information": "m.rodriguez@email.com, (555) 555-5555",
+                    "medical_record_number": "MRN24680",
+                    "category": "chronic"  # Diabetes patient requiring ongoing management
+                },
+                {
+                    "id": 4,
+                    "name": "Emily Johnson",
+                    "date_of_birth": "1988-03-27",
+                    "contact_information": "emily.j@email.com, (555) 222-3333",
+                    "medical_record_number": "MRN13579",
+                    "category": "chronic"  # Migraine patient requiring ongoing care
+                },
             ]
-            
-            # Patient 4 - Emily Johnson - Neurological issues
-            consultations4 = [
-                Consultation(
-                    patient_id=patient4.id,
-                    doctor_id=doctor4.id,
-                    date=datetime(2024, 9, 5),
-                    notes="New patient consultation for recurring headaches. Patient describes intense, throbbing pain predominantly on right side with photophobia and nausea, lasting 4-12 hours. Occurring 2-3 times monthly for past year. Family history of migraines.",
-                    diagnosis="Migraine without aura",
-                    treatment_plan="Prescribed sumatriptan 50mg for acute attacks. Recommended headache diary to identify triggers. Discussed stress reduction techniques."
-                ),
-                Consultation(
-                    patient_id=patient4.id,
-                    doctor_id=doctor4.id,
-                    date=datetime(2024, 12, 12),
-                    notes="Follow-up for migraines. Frequency increased to weekly episodes. Headache diary reveals correlation with menstrual cycle and lack of sleep. Sumatriptan provides relief but patient concerned about usage frequency.",
-                    diagnosis="Migraine without aura, increasing frequency",
-                    treatment_plan="Added propranolol 40mg daily for prevention. Continued acute treatment with sumatriptan. Ordered brain MRI to rule out secondary causes."
-                ),
-                Consultation(
-                    patient_id=patient4.id,
-                    doctor_id=doctor4.id,
-                    date=datetime(2025, 2, 28),
-                    notes="MRI results normal. Patient reports 40% reduction in headache frequency with propranolol. Sleep improved with recommended sleep hygiene practices. Still has severe episodes around menstruation.",
-                    diagnosis="Migraine without aura, menstrually-related",
-                    treatment_plan="Continued propranolol. Added naproxen sodium 500mg BID for 5 days around expected menstruation. Recommended CoQ10 supplement."
-                ),
-                Consultation(
-                    patient_id=patient4.id,
-                    doctor_id=doctor2.id,
-                    date=datetime(2025, 5, 15),
-                    notes="Patient seen for upper respiratory symptoms and concern about impact on migraines. Reports nasal congestion, sore throat for 3 days. No fever. Rapid strep test negative.",
-                    diagnosis="Viral upper respiratory infection, Migraine disorder (stable)",
-                    treatment_plan="Supportive care for URI. Continue current migraine management. Contact neurology if significant headache exacerbation occurs."
-                )
+
+            # Comprehensive consultation history
+            consultation_rows = [
+                # Patient 1 - John Doe - Cardiac patient
+                {
+                    "patient_id": 1,
+                    "doctor_id": 1,
+                    "date": datetime(2024, 11, 10),
+                    "notes": "Initial visit. Patient reports occasional chest pain during physical exertion. Family history of coronary artery disease. Father had MI at 58. Blood pressure 145/90. BMI 29.4.",
+                    "diagnosis": "Suspected coronary artery disease",
+                    "treatment_plan": "Ordered ECG and stress test. Prescribed atorvastatin 20mg daily. Recommended lifestyle changes including Mediterranean diet and moderate exercise."
+                },
+                {
+                    "patient_id": 1,
+                    "doctor_id": 1,
+                    "date": datetime(2025, 1, 15),
+                    "notes": "Follow-up visit. Stress test reveals moderate ischemia. Patient reports improved symptoms with medication but still experiences occasional angina with exertion. Blood pressure improved to 138/85.",
+                    "diagnosis": "Stable angina",
+                    "treatment_plan": "Continued current medication. Added metoprolol 25mg twice daily. Scheduled coronary angiogram for further evaluation."
+                },
+                {
+                    "patient_id": 1,
+                    "doctor_id": 1,
+                    "date": datetime(2025, 3, 5),
+                    "notes": "Post-angiogram follow-up. Angiogram showed 70% stenosis in LAD. Stent placed successfully. Patient reports no chest pain since procedure. Blood pressure 132/80.",
+                    "diagnosis": "Coronary artery disease, status post stent placement",
+                    "treatment_plan": "Continue atorvastatin and metoprolol. Added clopidogrel 75mg daily for 12 months. Cardiac rehabilitation recommended 3x weekly."
+                },
+                {
+                    "patient_id": 1,
+                    "doctor_id": 1,
+                    "date": datetime(2025, 5, 20),
+                    "notes": "Patient presented with chest pain and shortness of breath. States he missed 3 doses of medication last week. ECG shows no acute changes. Blood pressure elevated at 152/92.",
+                    "diagnosis": "Angina pectoris",
+                    "treatment_plan": "Reinforced medication adherence. Prescribed nitroglycerin sublingual for acute episodes. Follow-up in 2 weeks."
+                },
+                # Patient 2 - Sarah Williams - Generally healthy
+                {
+                    "patient_id": 2,
+                    "doctor_id": 2,
+                    "date": datetime(2024, 8, 12),
+                    "notes": "Annual physical examination. Patient reports good overall health with occasional headaches after long work hours. No significant findings on physical exam. BMI 23.1, BP 118/78.",
+                    "diagnosis": "Healthy check-up, tension headaches",
+                    "treatment_plan": "Recommended regular breaks when working, proper hydration. Follow up in 12 months or as needed."
+                },
+                {
+                    "patient_id": 2,
+                    "doctor_id": 2,
+                    "date": datetime(2025, 2, 3),
+                    "notes": "Patient presented with fever, cough, and congestion for 5 days. Temp 100.4°F. Lungs clear. Rapid COVID and flu tests negative.",
+                    "diagnosis": "Upper respiratory tract infection, likely viral",
+                    "treatment_plan": "Symptomatic treatment with acetaminophen, fluids, and rest. Return if symptoms worsen or persist beyond 10 days."
+                },
+                # Patient 3 - Michael Rodriguez - Diabetes patient
+                {
+                    "patient_id": 3,
+                    "doctor_id": 3,
+                    "date": datetime(2024, 7, 22),
+                    "notes": "Initial visit for diabetes management. Patient reports polyuria, polydipsia, and unintentional weight loss of 15 lbs over 3 months. Random blood glucose 278 mg/dL. HbA1c 9.2%. Family history of T2DM.",
+                    "diagnosis": "Type 2 Diabetes Mellitus, newly diagnosed",
+                    "treatment_plan": "Started on metformin 500mg BID with meals. Diabetes education provided. Referral to nutritionist. Recommended daily blood glucose monitoring."
+                },
+                {
+                    "patient_id": 3,
+                    "doctor_id": 3,
+                    "date": datetime(2024, 10, 18),
+                    "notes": "Follow-up visit. Patient reports improved symptoms. Has lost 5 more pounds intentionally through diet changes. Blood glucose readings averaging 160-180 mg/dL. HbA1c improved to 8.1%.",
+                    "diagnosis": "Type 2 Diabetes Mellitus, improving",
+                    "treatment_plan": "Increased metformin to 1000mg BID. Continued lifestyle modifications. Lab work ordered for kidney function and lipid panel."
+                },
+                {
+                    "patient_id": 3,
+                    "doctor_id": 3,
+                    "date": datetime(2025, 1, 25),
+                    "notes": "Quarterly follow-up. Patient doing well with medication and diet compliance. Blood glucose readings now averaging 120-140 mg/dL. HbA1c 7.2%. Mild neuropathic symptoms noted in feet.",
+                    "diagnosis": "Type 2 Diabetes Mellitus with early peripheral neuropathy",
+                    "treatment_plan": "Continued current medication. Added alpha-lipoic acid supplement. Referred to podiatry for comprehensive foot evaluation."
+                },
+                {
+                    "patient_id": 3,
+                    "doctor_id": 1,
+                    "date": datetime(2025, 4, 30),
+                    "notes": "Cardiology consultation for diabetes and newly detected hypertension. ECG normal. BP 148/88. Patient reports occasional palpitations.",
+                    "diagnosis": "Essential hypertension, Type 2 Diabetes Mellitus",
+                    "treatment_plan": "Started on lisinopril 10mg daily. Recommended DASH diet in addition to diabetic diet. 24-hour Holter monitor ordered for palpitations."
+                },
+                # Patient 4 - Emily Johnson - Neurological issues
+                {
+                    "patient_id": 4,
+                    "doctor_id": 4,
+                    "date": datetime(2024, 9, 5),
+                    "notes": "New patient consultation for recurring headaches. Patient describes intense, throbbing pain predominantly on right side with photophobia and nausea, lasting 4-12 hours. Occurring 2-3 times monthly for past year. Family history of migraines.",
+                    "diagnosis": "Migraine without aura",
+                    "treatment_plan": "Prescribed sumatriptan 50mg for acute attacks. Recommended headache diary to identify triggers. Discussed stress reduction techniques."
+                },
+                {
+                    "patient_id": 4,
+                    "doctor_id": 4,
+                    "date": datetime(2024, 12, 12),
+                    "notes": "Follow-up for migraines. Frequency increased to weekly episodes. Headache diary reveals correlation with menstrual cycle and lack of sleep. Sumatriptan provides relief but patient concerned about usage frequency.",
+                    "diagnosis": "Migraine without aura, increasing frequency",
+                    "treatment_plan": "Added propranolol 40mg daily for prevention. Continued acute treatment with sumatriptan. Ordered brain MRI to rule out secondary causes."
+                },
+                {
+                    "patient_id": 4,
+                    "doctor_id": 4,
+                    "date": datetime(2025, 2, 28),
+                    "notes": "MRI results normal. Patient reports 40% reduction in headache frequency with propranolol. Sleep improved with recommended sleep hygiene practices. Still has severe episodes around menstruation.",
+                    "diagnosis": "Migraine without aura, menstrually-related",
+                    "treatment_plan": "Continued propranolol. Added naproxen sodium 500mg BID for 5 days around expected menstruation. Recommended CoQ10 supplement."
+                },
+                {
+                    "patient_id": 4,
+                    "doctor_id": 2,
+                    "date": datetime(2025, 5, 15),
+                    "notes": "Patient seen for upper respiratory symptoms and concern about impact on migraines. Reports nasal congestion, sore throat for 3 days. No fever. Rapid strep test negative.",
+                    "diagnosis": "Viral upper respiratory infection, Migraine disorder (stable)",
+                    "treatment_plan": "Supportive care for URI. Continue current migraine management. Contact neurology if significant headache exacerbation occurs."
+                },
             ]
-            
-            # Add all consultations
-            all_consultations = consultations1 + consultations2 + consultations3 + consultations4
-            session.add_all(all_consultations)
-            
-            # Create sample appointments
-            appointments = [
-                Appointment(
-                    patient_id=patient1.id,
-                    doctor_id=doctor1.id,
-                    date_time=datetime(2025, 6, 10, 14, 30),
-                    status="scheduled",
-                    purpose="Follow-up appointment for angina"
-                ),
-                Appointment(
-                    patient_id=patient2.id,
-                    doctor_id=doctor2.id,
-                    date_time=datetime(2025, 6, 15, 10, 0),
-                    status="scheduled",
-                    purpose="Annual check-up"
-                ),
-                Appointment(
-                    patient_id=patient3.id,
-                    doctor_id=doctor3.id,
-                    date_time=datetime(2025, 6, 12, 11, 15),
-                    status="scheduled",
-                    purpose="Quarterly diabetes monitoring"
-                ),
-                Appointment(
-                    patient_id=patient4.id,
-                    doctor_id=doctor4.id,
-                    date_time=datetime(2025, 6, 18, 9, 30),
-                    status="scheduled",
-                    purpose="Migraine therapy evaluation"
-                ),
-                Appointment(
-                    patient_id=patient1.id,
-                    doctor_id=doctor1.id,
-                    date_time=datetime(2025, 8, 5, 13, 0),
-                    status="scheduled",
-                    purpose="Cardiac stress test follow-up"
-                ),
-                Appointment(
-                    patient_id=patient3.id,
-                    doctor_id=doctor3.id,
-                    date_time=datetime(2025, 9, 10, 15, 45),
-                    status="scheduled",
-                    purpose="HbA1c check and medication review"
-                )
+
+            appointment_rows = [
+                {
+                    "patient_id": 1,
+                    "doctor_id": 1,
+                    "date_time": datetime(2025, 6, 10, 14, 30),
+                    "status": "scheduled",
+                    "purpose": "Follow-up appointment for angina"
+                },
+                {
+                    "patient_id": 2,
+                    "doctor_id": 2,
+                    "date_time": datetime(2025, 6, 15, 10, 0),
+                    "status": "scheduled",
+                    "purpose": "Annual check-up"
+                },
+                {
+                    "patient_id": 3,
+                    "doctor_id": 3,
+                    "date_time": datetime(2025, 6, 12, 11, 15),
+                    "status": "scheduled",
+                    "purpose": "Quarterly diabetes monitoring"
+                },
+                {
+                    "patient_id": 4,
+                    "doctor_id": 4,
+                    "date_time": datetime(2025, 6, 18, 9, 30),
+                    "status": "scheduled",
+                    "purpose": "Migraine therapy evaluation"
+                },
+                {
+                    "patient_id": 1,
+                    "doctor_id": 1,
+                    "date_time": datetime(2025, 8, 5, 13, 0),
+                    "status": "scheduled",
+                    "purpose": "Cardiac stress test follow-up"
+                },
+                {
+                    "patient_id": 3,
+                    "doctor_id": 3,
+                    "date_time": datetime(2025, 9, 10, 15, 45),
+                    "status": "scheduled",
+                    "purpose": "HbA1c check and medication review"
+                },
             ]
-            session.add_all(appointments)
-            
+
+            self._bulk_insert(session, Doctor.__table__, doctor_rows)
+            self._bulk_insert(session, Patient.__table__, patient_rows)
+            self._bulk_insert(
+                session, Consultation.__table__, consultation_rows
+            )
+            self._bulk_insert(
+                session, Appointment.__table__, appointment_rows
+            )
             session.commit()
-        
+
         session.close()
-    
-    def get_all_doctors(self) -> List[int]:
+
+    @staticmethod
+    def _bulk_insert(session, table, rows: List[Dict[str, Any]]) -> None:
+        """Insert rows using the fastest bulk path for the dialect.
+
+        On PostgreSQL the rows are streamed through COPY, which skips
+        per-row INSERT parsing entirely; every other dialect falls back
+        to a single executemany INSERT.
+
+        Args:
+            session: Session to insert within (caller commits)
+            table: Core Table object to insert into
+            rows: List of column-name to value dictionaries
+        """
+        if not rows:
+            return
+
+        if session.bind.dialect.name == "postgresql":
+            # Preserve table column order, restricted to the keys the
+            # rows actually carry (e.g. autoincrement ids may be absent)
+            columns = [c.name for c in table.columns if c.name in rows[0]]
+
+            def to_field(value):
+                if value is None:
+                    return "\\N"
+                if isinstance(value, datetime):
+                    return value.isoformat(sep=" ")
+                return (str(value)
+                        .replace("\\", "\\\\")
+                        .replace("\t", "\\t")
+                        .replace("\n", "\\n")
+                        .replace("\r", "\\r"))
+
+            buffer = io.StringIO()
+            for row in rows:
+                buffer.write(
+                    "\t".join(to_field(row.get(col)) for col in columns)
+                )
+                buffer.write("\n")
+            buffer.seek(0)
+
+            cursor = session.connection().connection.cursor()
+            try:
+                cursor.copy_from(buffer, table.name, columns=columns)
+            finally:
+                cursor.close()
+        else:
+            session.execute(table.insert(), rows)
+
+    def get_all_doctors(self, session: Optional[Session] = None) -> List[int]:
         """Get IDs of all doctors.
-        
+
+        Args:
+            session: Optional session to reuse
+
         Returns:
             List of doctor IDs
         """
-        session = self.Session()
-        doctors = session.query(Doctor.id).all()
-        session.close()
-        return [doctor[0] for doctor in doctors]
-    
-    def get_doctor_name(self, doctor_id: int) -> str:
+        with self._session_scope(session) as s:
+            doctor_ids = s.scalars(_ALL_DOCTOR_IDS_STMT).all()
+        return list(doctor_ids)
+
+    def get_doctor_name(
+        self, doctor_id: int, session: Optional[Session] = None
+    ) -> str:
         """Get name of doctor by ID.
-        
+
         Args:
             doctor_id: ID of the doctor
-            
+            session: Optional session to reuse
+
         Returns:
             Name of the doctor or 'Unknown Doctor' if not found
         """
-        session = self.Session()
-        doctor = session.query(Doctor).filter(Doctor.id == doctor_id).first()
-        session.close()
-        return doctor.name if doctor else "Unknown Doctor"
-    
-    def get_patients_for_doctor(self, doctor_id: int) -> List[int]:
-        """Get IDs of patients associated with a doctor.
-        
+        cached = self._doctor_name_cache.get(doctor_id)
+        if cached is not None:
+            return cached
+
+        with self._session_scope(session) as s:
+            name = s.execute(_doctor_name_stmt(doctor_id)).scalar()
+        if name:
+            self._doctor_name_cache[doctor_id] = name
+        return name if name else "Unknown Doctor"
+
+    def get_doctor_names(
+        self, doctor_ids, session: Optional[Session] = None
+    ) -> Dict[int, str]:
+        """Get names for a set of doctors in one query.
+
         Args:
-            doctor_id: ID of the doctor
-            
+            doctor_ids: Iterable of doctor IDs
+            session: Optional session to reuse
+
         Returns:
-            List of patient IDs associated with the doctor
+            Dict mapping doctor ID to name
         """
-        session = self.Session()
-        
-        # Get unique patient IDs from consultations and appointments
-        patient_ids_from_consultations = session.query(
-            Consultation.patient_id
-        ).filter(
-            Consultation.doctor_id == doctor_id
-        ).distinct().all()
-        
-        patient_ids_from_appointments = session.query(
-            Appointment.patient_id
-        ).filter(
-            Appointment.doctor_id == doctor_id
-        ).distinct().all()
-        
-        # Combine and deduplicate
-        all_patient_ids = set(
-            [p[0] for p in patient_ids_from_consultations + 
-             patient_ids_from_appointments]
-        )
-        
-        session.close()
-        return list(all_patient_ids)
-    
-    def get_patient_name(self, patient_id: int) -> str:
+        ids = list(doctor_ids)
+        if not ids:
+            return {}
+
+        # Only hit the database for IDs not already memoized
+        names = {
+            doctor_id: self._doctor_name_cache[doctor_id]
+            for doctor_id in ids if doctor_id in self._doctor_name_cache
+        }
+        missing = [doctor_id for doctor_id in ids if doctor_id not in names]
+        if missing:
+            with self._session_scope(session) as s:
+                rows = s.query(Doctor.id, Doctor.name).filter(
+                    Doctor.id.in_(missing)
+                ).all()
+            self._doctor_name_cache.update(rows)
+            names.update(rows)
+        return names
+
+    def get_patient_name(
+        self, patient_id: int, session: Optional[Session] = None
+    ) -> str:
         """Get name of patient by ID.
-        
+
         Args:
             patient_id: ID of the patient
-            
+            session: Optional session to reuse
+
         Returns:
             Name of the patient or 'Unknown Patient' if not found
         """
-        session = self.Session()
-        patient = session.query(Patient).filter(Patient.id == patient_id).first()
-        session.close()
-        return patient.name if patient else "Unknown Patient"
-        
-    def get_patient_category(self, patient_id: int) -> str:
+        with self._session_scope(session) as s:
+            name = s.execute(
+                _PATIENT_NAME_STMT, {"pid": patient_id}
+            ).scalar()
+        return name if name else "Unknown Patient"
+
+    def get_patient_category(
+        self, patient_id: int, session: Optional[Session] = None
+    ) -> str:
         """Get category (chronic/acute) of patient by ID.
-        
+
         Args:
             patient_id: ID of the patient
-            
+            session: Optional session to reuse
+
         Returns:
             Category of the patient or 'unknown' if not found
         """
-        session = self.Session()
-        patient = session.query(Patient).filter(Patient.id == patient_id).first()
-        session.close()
-        return patient.category if patient else "unknown"
-        
-    def get_patients_by_category(self, doctor_id: int, category: str) -> List[int]:
-        """Get patients of a specific category associated with a doctor.
-        
+        with self._session_scope(session) as s:
+            category = s.execute(
+                _PATIENT_CATEGORY_STMT, {"pid": patient_id}
+            ).scalar()
+        return category if category else "unknown"
+
+
+    def list_patients(
+        self, doctor_id: int, category: Optional[str] = None,
+        session: Optional[Session] = None
+    ) -> List[Tuple[int, str, str]]:
+        """List a doctor's patients with name and category in one query.
+
+        The doctor association (via consultations or appointments) and
+        the optional category filter are evaluated in SQL, so the
+        caller gets the final rows in a single round trip.
+
         Args:
             doctor_id: ID of the doctor
-            category: 'chronic' or 'acute'
-            
+            category: Optional category filter ('chronic' or 'acute');
+                None returns patients of every category
+            session: Optional session to reuse
+
         Returns:
-            List of patient IDs matching the category
+            List of (patient_id, name, category) tuples
         """
-        session = self.Session()
-        
-        # First get all patients for this doctor
-        all_patient_ids = self.get_patients_for_doctor(doctor_id)
-        
-        # Then filter by category
-        filtered_patients = session.query(Patient.id).filter(
-            Patient.id.in_(all_patient_ids),
-            Patient.category == category
-        ).all()
-        
-        session.close()
-        return [p[0] for p in filtered_patients]
-    
-    def get_patient(self, patient_id: int) -> Optional[Patient]:
+        # The two doctor associations are combined with a UNION inside
+        # the database (each side an indexed doctor_id scan) instead of
+        # two correlated EXISTS probes per patient row
+        patient_ids = select(Consultation.patient_id).where(
+            Consultation.doctor_id == doctor_id
+        ).union(
+            select(Appointment.patient_id).where(
+                Appointment.doctor_id == doctor_id
+            )
+        )
+
+        with self._session_scope(session) as s:
+            query = s.query(
+                Patient.id, Patient.name, Patient.category
+            ).filter(Patient.id.in_(patient_ids))
+
+            if category is not None:
+                query = query.filter(Patient.category == category)
+
+            patients = query.order_by(Patient.name).all()
+        return [(p[0], p[1], p[2]) for p in patients]
+
+    def get_patient(
+        self, patient_id: int, session: Optional[Session] = None
+    ) -> Optional[Patient]:
         """Get patient details by ID.
-        
+
         Args:
             patient_id: ID of the patient
-            
+            session: Optional session to reuse
+
         Returns:
             Patient object or None if not found
         """
-        session = self.Session()
-        patient = session.query(Patient).filter(Patient.id == patient_id).first()
-        session.close()
+        with self._session_scope(session) as s:
+            patient = s.scalars(_patient_by_id_stmt(patient_id)).first()
         return patient
-    
-    def get_patient_consultations(self, patient_id: int) -> List[Consultation]:
-        """Get consultations for a patient.
-        
+
+    def get_patient_consultations(
+        self, patient_id: int, limit: Optional[int] = None,
+        offset: Optional[int] = None, session: Optional[Session] = None
+    ) -> List[Consultation]:
+        """Get consultations for a patient, most recent first.
+
         Args:
             patient_id: ID of the patient
-            
+            limit: Optional maximum number of records to return
+            offset: Optional number of records to skip
+            session: Optional session to reuse
+
         Returns:
             List of consultation records for the patient
         """
-        session = self.Session()
-        consultations = session.query(Consultation).filter(
-            Consultation.patient_id == patient_id
-        ).order_by(Consultation.date.desc()).all()
-        session.close()
+        with self._session_scope(session) as s:
+            consultations = s.scalars(
+                _patient_consultations_stmt(patient_id, limit, offset)
+            ).all()
         return consultations
-    
-    def get_patient_appointments(self, patient_id: int) -> List[Appointment]:
+
+    def get_patient_appointments(
+        self, patient_id: int, session: Optional[Session] = None
+    ) -> List[Appointment]:
         """Get appointments for a patient.
-        
+
         Args:
             patient_id: ID of the patient
-            
+            session: Optional session to reuse
+
         Returns:
             List of appointment records for the patient
         """
-        session = self.Session()
-        appointments = session.query(Appointment).filter(
-            Appointment.patient_id == patient_id
-        ).order_by(Appointment.date_time.asc()).all()
-        session.close()
+        with self._session_scope(session) as s:
+            appointments = s.scalars(
+                _PATIENT_APPOINTMENTS_STMT, {"pid": patient_id}
+            ).all()
         return appointments
-    
-    def create_appointment(self, patient_id: int, doctor_id: int, 
+
+    def get_upcoming_appointments(
+        self, patient_id: int, session: Optional[Session] = None
+    ):
+        """Get scheduled future appointment rows for a patient.
+
+        The time and status predicates run in SQL (backed by the
+        composite index on patient_id/date_time/status), and only the
+        columns the context builder uses are projected, with the
+        doctor name resolved via a join.
+
+        Args:
+            patient_id: ID of the patient
+            session: Optional session to reuse
+
+        Returns:
+            List of (date_time, purpose, doctor_name) rows, soonest
+            first
+        """
+        with self._session_scope(session) as s:
+            rows = s.execute(
+                _UPCOMING_APPOINTMENTS_STMT,
+                {"pid": patient_id, "now": datetime.now()},
+            ).all()
+        return rows
+
+    def get_recent_consultations(
+        self, patient_id: int, limit: Optional[int] = 3,
+        session: Optional[Session] = None
+    ):
+        """Get recent consultation rows for the context builder.
+
+        Projects only the columns the context needs (plus the doctor
+        name via a join) instead of hydrating full ORM entities, so no
+        identity-map bookkeeping or lazy-loadable objects are built.
+
+        Args:
+            patient_id: ID of the patient
+            limit: Maximum rows to return, most recent first; None
+                returns all of them
+            session: Optional session to reuse
+
+        Returns:
+            List of (date, diagnosis, notes, treatment_plan,
+            doctor_name) rows
+        """
+        if limit is not None:
+            stmt = _RECENT_CONSULTATIONS_LIMITED_STMT
+            params = {"pid": patient_id, "lim": limit}
+        else:
+            stmt = _RECENT_CONSULTATIONS_STMT
+            params = {"pid": patient_id}
+
+        with self._session_scope(session) as s:
+            rows = s.execute(stmt, params).all()
+        return rows
+
+    def get_patient_version(
+        self, patient_id: int, session: Optional[Session] = None
+    ) -> Tuple[Optional[int], Optional[int], Optional[str]]:
+        """Get a cheap change token for a patient's history.
+
+        The token moves whenever a consultation or appointment is
+        added or the patient's category changes, so callers can detect
+        staleness without reading the history itself.
+
+        Args:
+            patient_id: ID of the patient
+            session: Optional session to reuse
+
+        Returns:
+            (max consultation ID, max appointment ID, category) for
+            the patient; the ID elements are None when the patient has
+            no such records
+        """
+        with self._session_scope(session) as s:
+            row = s.execute(
+                select(
+                    select(func.max(Consultation.id)).where(
+                        Consultation.patient_id == patient_id
+                    ).scalar_subquery(),
+                    select(func.max(Appointment.id)).where(
+                        Appointment.patient_id == patient_id
+                    ).scalar_subquery(),
+                    select(Patient.category).where(
+                        Patient.id == patient_id
+                    ).scalar_subquery(),
+                )
+            ).one()
+        return (row[0], row[1], row[2])
+
+    def get_patient_context_data(
+        self, patient_id: int, consultations_limit: Optional[int] = 3
+    ) -> Tuple[Optional[Patient], List, List]:
+        """Get everything build_patient_context needs in one session.
+
+        Args:
+            patient_id: ID of the patient
+            consultations_limit: Maximum consultations to include
+
+        Returns:
+            Tuple of (patient, recent consultation rows, upcoming
+            appointment rows); patient is None if not found
+        """
+        with self._session_scope() as s:
+            # raiseload keeps the N+1 tripwire from the entity days:
+            # relationship access on this patient raises rather than
+            # silently querying
+            patient = s.query(Patient).options(raiseload("*")).filter(
+                Patient.id == patient_id
+            ).one_or_none()
+            if patient is None:
+                return None, [], []
+            consultations = self.get_recent_consultations(
+                patient_id, limit=consultations_limit, session=s
+            )
+            upcoming = self.get_upcoming_appointments(
+                patient_id, session=s
+            )
+        return patient, consultations, upcoming
+
+    def get_patient_appointments_df(self, patient_id: int) -> pd.DataFrame:
+        """Get appointments for a patient as a DataFrame.
+
+        Reads the display columns straight from SQL into a DataFrame,
+        skipping per-row ORM object construction for read-only views.
+
+        Args:
+            patient_id: ID of the patient
+
+        Returns:
+            DataFrame with date_time, purpose and status columns
+        """
+        return pd.read_sql(
+            text(
+                "SELECT date_time, purpose, status FROM appointments "
+                "WHERE patient_id = :pid ORDER BY date_time"
+            ),
+            self.engine,
+            params={"pid": patient_id},
+            parse_dates=["date_time"],
+        )
+
+    def create_appointment(self, patient_id: int, doctor_id: int,
                           date_time: datetime, purpose: str, 
                           status: str = "scheduled") -> Appointment:
         """Create a new appointment.
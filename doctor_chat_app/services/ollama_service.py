@@ -3,9 +3,49 @@
 Provides methods for sending prompts to an Ollama LLM instance and handling responses.
 """
 import json
-from typing import Dict, Any, List, Optional
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter, Retry
+
+# Optional fast JSON codec: orjson speeds up payload encoding and the
+# per-line NDJSON decode in streaming mode; stdlib json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Streamed tokens are coalesced before being yielded to the UI: flush
+# once the buffer reaches this many characters, this much time has
+# passed, or the token ends on a whitespace boundary.
+_STREAM_FLUSH_CHARS = 8
+_STREAM_FLUSH_SECONDS = 0.040
+
+# (connect, read) timeouts for generate calls: fail fast when the load
+# balancer is unreachable, but allow long generations to stream
+_GENERATE_TIMEOUT = (5, 120)
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _json_dumps(obj: Any):
+    """Encode a payload with orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj)
+
+
+def _json_loads(data) -> Any:
+    """Decode JSON with orjson when available, stdlib json otherwise.
+
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers
+    can keep a single except clause.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 class OllamaService:
@@ -22,50 +62,166 @@ class OllamaService:
         self.base_url = base_url.rstrip('/')
         self.model = model
         self.generate_endpoint = self.base_url
+
+        # Pooled keep-alive session: the service is a singleton (via
+        # st.cache_resource), so connections to the load balancer are
+        # reused across chat turns instead of re-handshaking each time
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=50,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=[502, 503, 504],
+            ),
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        # Worker pool for non-blocking calls; sized to the adapter's
+        # pool_connections so every in-flight call has a connection
+        self._executor = ThreadPoolExecutor(max_workers=10)
     
     def get_response(self, prompt: str, context: Optional[str] = None) -> str:
-        """Get a response from the Ollama API.
-        
+        """Get a complete response from the Ollama API.
+
+        Thin wrapper over stream_response that accumulates the streamed
+        fragments, so both entry points share one request path and the
+        full response JSON is never buffered server-side.
+
         Args:
             prompt: The prompt to send to the model
             context: Additional context to provide to the model (patient info, etc.)
-            
+
         Returns:
             The generated response text
         """
+        chunks = list(self.stream_response(prompt, context))
+        if not chunks:
+            return "No response received from model."
+        return "".join(chunks)
+    
+    def get_response_async(
+        self, prompt: str, context: Optional[str] = None
+    ) -> "Future[str]":
+        """Start a generate call without blocking the caller.
+
+        Runs get_response on the service's worker pool so the caller
+        can keep doing other work (building patient context, DB reads)
+        while the model generates, then collect the text with
+        .result().
+
+        Args:
+            prompt: The prompt to send to the model
+            context: Additional context to provide to the model (patient info, etc.)
+
+        Returns:
+            Future resolving to the generated response text
+        """
+        return self._executor.submit(self.get_response, prompt, context)
+
+    def stream_response(
+        self, prompt: str, context: Optional[str] = None
+    ) -> Iterator[str]:
+        """Stream a response from the Ollama API token by token.
+
+        Uses Ollama's native streaming mode so tokens can be rendered
+        as soon as they are generated instead of waiting for the full
+        response. Sub-word tokens are buffered and flushed on word or
+        time boundaries so each yield corresponds to one frontend
+        re-render rather than one per token.
+
+        Args:
+            prompt: The prompt to send to the model
+            context: Additional context to provide to the model (patient info, etc.)
+
+        Yields:
+            Response text fragments as they arrive from the model
+        """
         # Build complete prompt with context if provided
         complete_prompt = prompt
         if context:
             complete_prompt = f"Context:\n{context}\n\nQuestion: {prompt}"
-        
+
         payload = {
             "model": self.model,
             "prompt": complete_prompt,
-            "stream": False,
+            "stream": True,
             "options": {
                 "temperature": 0.7,
                 "top_p": 0.9,
                 "max_tokens": 1024
             }
         }
-        
+
         try:
-            response = requests.post(self.generate_endpoint, json=payload)
+            response = self._session.post(
+                self.generate_endpoint, data=_json_dumps(payload),
+                headers=_JSON_HEADERS, stream=True,
+                timeout=_GENERATE_TIMEOUT,
+            )
             response.raise_for_status()
-            
-            result = response.json()
-            return result.get("response", "No response received from model.")
-            
+
+            buffer = ""
+            last_flush = time.perf_counter()
+
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = _json_loads(line)
+                token = chunk.get("response", "")
+                if token:
+                    buffer += token
+                    now = time.perf_counter()
+                    if (len(buffer) >= _STREAM_FLUSH_CHARS
+                            or now - last_flush >= _STREAM_FLUSH_SECONDS
+                            or token[-1].isspace()):
+                        yield buffer
+                        buffer = ""
+                        last_flush = now
+                if chunk.get("done"):
+                    break
+
+            if buffer:
+                yield buffer
+
         except requests.exceptions.RequestException as e:
             error_msg = f"Error connecting to Ollama API: {str(e)}"
             print(error_msg)
-            return f"Error: {error_msg}"
-            
+            yield f"Error: {error_msg}"
+
         except json.JSONDecodeError:
             error_msg = "Invalid JSON response from Ollama API"
             print(error_msg)
-            return f"Error: {error_msg}"
-    
+            yield f"Error: {error_msg}"
+
+    def warm_up(self, prompt: str = "") -> None:
+        """Warm the model ahead of a generate call.
+
+        Issues a zero-token generate request so the model is loaded
+        (and any shared prompt prefix prefilled) before the real
+        request arrives. Best-effort: failures are ignored, the
+        subsequent generate call simply pays the cold cost.
+
+        Args:
+            prompt: Optional prompt prefix to prefill
+        """
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False,
+            "options": {"num_predict": 0}
+        }
+
+        try:
+            self._session.post(
+                self.generate_endpoint, data=_json_dumps(payload),
+                headers=_JSON_HEADERS, timeout=10,
+            )
+        except requests.exceptions.RequestException:
+            pass
+
     def health_check(self) -> bool:
         """Check if the Ollama API is available.
         
@@ -73,7 +229,9 @@ class OllamaService:
             True if the API is available, False otherwise
         """
         try:
-            response = requests.get(f"{self.base_url}/api/health")
+            response = self._session.get(
+                f"{self.base_url}/api/health", timeout=(5, 10)
+            )
             return response.status_code == 200
         except requests.exceptions.RequestException:
             return False
@@ -2,11 +2,26 @@
 
 Provides functions to build context from patient data and create system prompts.
 """
-from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 
 from services.database_service import DatabaseService
 
+# Built context strings keyed by patient ID. Each entry stores the
+# patient's change token alongside the string, so repeat chat turns
+# about an unchanged patient skip the history queries and formatting.
+_ctx_cache: Dict[int, Tuple[tuple, str]] = {}
+
+# One format call per record instead of a handful of f-string
+# temporaries and per-field appends inside the loops
+CONSULT_TEMPLATE = (
+    "Consultation on {date} with {doctor}:\n"
+    "Diagnosis: {diagnosis}\n"
+    "Notes: {notes}\n"
+    "Treatment: {treatment}\n"
+    "\n"
+)
+APPT_TEMPLATE = "{date_time} with {doctor}: {purpose}"
+
 
 def build_patient_context(patient_id: int, db_service: DatabaseService) -> str:
     """Build context string for the LLM with relevant patient information.
@@ -18,13 +33,21 @@ def build_patient_context(patient_id: int, db_service: DatabaseService) -> str:
     Returns:
         A formatted context string containing patient information
     """
-    patient = db_service.get_patient(patient_id)
+    # Reuse the cached string when the patient's change token (max
+    # history IDs plus category) has not moved since it was built
+    version = db_service.get_patient_version(patient_id)
+    cached = _ctx_cache.get(patient_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    # One session fetches the patient plus projected consultation and
+    # upcoming-appointment rows (doctor names resolved via joins)
+    patient, consultations, upcoming_appointments = (
+        db_service.get_patient_context_data(patient_id)
+    )
     if not patient:
         return "No patient data available."
     
-    consultations = db_service.get_patient_consultations(patient_id)
-    appointments = db_service.get_patient_appointments(patient_id)
-    
     # Build context with patient information
     context_parts = [
         "PATIENT INFORMATION:",
@@ -32,45 +55,40 @@ def build_patient_context(patient_id: int, db_service: DatabaseService) -> str:
         f"Date of Birth: {patient.date_of_birth}",
         f"Medical Record Number: {patient.medical_record_number}",
         f"Contact: {patient.contact_information}",
-        f"Category: {patient.category.capitalize()}",
+        f"Category: {(patient.category or 'unknown').capitalize()}",
         "\n"
     ]
     
-    # Add consultation history
+    # Add consultation history (already limited to the most recent 3
+    # in SQL by get_patient_context_data)
     context_parts.append("CONSULTATION HISTORY:")
     if consultations:
-        # Limit to most recent 3 consultations
-        for i, consultation in enumerate(consultations[:3]):
-            doc_name = db_service.get_doctor_name(consultation.doctor_id)
-            context_parts.extend([
-                f"Consultation on {consultation.date.strftime('%Y-%m-%d')} "
-                f"with {doc_name}:",
-                f"Diagnosis: {consultation.diagnosis}",
-                f"Notes: {consultation.notes}",
-                f"Treatment: {consultation.treatment_plan}",
-                "\n"
-            ])
+        for consultation in consultations:
+            context_parts.append(CONSULT_TEMPLATE.format(
+                date=consultation.date.strftime("%Y-%m-%d"),
+                doctor=consultation.doctor_name or "Unknown Doctor",
+                diagnosis=consultation.diagnosis,
+                notes=consultation.notes,
+                treatment=consultation.treatment_plan,
+            ))
     else:
         context_parts.append("No previous consultations found.")
     
     # Add upcoming appointments
     context_parts.append("UPCOMING APPOINTMENTS:")
-    upcoming_appointments = [
-        apt for apt in appointments 
-        if apt.date_time > datetime.now() and apt.status == "scheduled"
-    ]
-    
     if upcoming_appointments:
         for appointment in upcoming_appointments:
-            doc_name = db_service.get_doctor_name(appointment.doctor_id)
-            context_parts.append(
-                f"{appointment.date_time.strftime('%Y-%m-%d %H:%M')} with "
-                f"{doc_name}: {appointment.purpose}"
-            )
+            context_parts.append(APPT_TEMPLATE.format(
+                date_time=appointment.date_time.strftime("%Y-%m-%d %H:%M"),
+                doctor=appointment.doctor_name or "Unknown Doctor",
+                purpose=appointment.purpose,
+            ))
     else:
         context_parts.append("No upcoming appointments.")
     
-    return "\n".join(context_parts)
+    context = "\n".join(context_parts)
+    _ctx_cache[patient_id] = (version, context)
+    return context
 
 
 def build_system_prompt() -> str:
@@ -92,3 +110,8 @@ When providing information:
 4. Reference specific dates and doctors when mentioning consultations
 5. Keep patient information confidential
 """
+
+
+# The prompt is a constant, so build it once at import time; callers
+# can use the module constant instead of re-invoking the function
+SYSTEM_PROMPT = build_system_prompt()